@@ -5,6 +5,7 @@
 import tcod.context
 import tcod.ecs
 
+import game.simulation
 import game.state
 
 context: tcod.context.Context
@@ -15,3 +16,6 @@
 
 states: list[game.state.State] = []
 """A stack of states with the last item being the active state."""
+
+simulation: game.simulation.Simulation | None = None
+"""The threaded simulation, if enabled. When set, actions must be submitted to it instead of run on `g.world`."""
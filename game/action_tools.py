@@ -0,0 +1,19 @@
+"""Functions for performing actions."""
+
+from __future__ import annotations
+
+from tcod.ecs import Entity
+
+from game.action import Impossible, Planner
+from game.state import StateResult
+
+
+def do_action(entity: Entity, action: Planner) -> StateResult:
+    """Perform an action."""
+    plan_result = action.plan(entity)
+    match plan_result:
+        case Impossible(reason=_reason):
+            pass
+        case _:
+            plan_result.execute(entity)
+    return None
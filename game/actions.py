@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from typing import Final
+
 import attrs
+import numpy as np
+import tcod.path
+from numpy.typing import NDArray
 from tcod.ecs import Entity
 
+import game.map_tools
 from game.action import Action, Done, ExecuteResult, Impossible, Planner, PlanResult
-from game.components import MapTiles, Position
+from game.components import Graphic, MapExplored, MapItems, MapTiles, Position
+from game.tags import ChildOf, IsItem, IsPlayer
 from game.tiles import TILE_DB
 
+MAX_TRAVEL_STEPS: Final = 1000
+"""Maximum number of moves performed by a single travel action."""
+
+EXPLORE_MARGIN: Final = 8
+"""Distance beyond the view which is searched for unexplored tiles before searching the whole map."""
+
 
 @attrs.define
 class MoveAction(Action):
@@ -32,9 +46,11 @@ def execute(self, entity: Entity) -> ExecuteResult:
         """Move the entity."""
         pos = entity.components[Position] = entity.components[Position] + self.direction
         tiles = pos.z.components[MapTiles]
+        if IsPlayer in entity.tags:
+            game.map_tools.mark_explored(pos)
 
         if TILE_DB["dig_cost"][tiles[pos.y, pos.x]]:
-            tiles[pos.y, pos.x] += 1  # The next index is always the dug-out tile.
+            game.map_tools.set_tile(pos.z, pos.ij, tiles[pos.ij] + 1)  # The next index is always the dug-out tile.
             return Done(TILE_DB["dig_cost"][tiles[pos.y, pos.x]])
         return Done(TILE_DB["move_cost"][tiles[pos.y, pos.x]])
 
@@ -48,3 +64,214 @@ class BumpAction(Planner):
     def plan(self, entity: Entity) -> PlanResult:
         """Defer to a connext sensitive action."""
         return MoveAction(self.direction).plan(entity)
+
+
+@attrs.define
+class PickupAction(Action):
+    """Pick up an item from the floor."""
+
+    def plan(self, entity: Entity) -> PlanResult:
+        """Verify that there is an item here."""
+        pos = entity.components[Position]
+        if not pos.z.components[MapItems][pos.ij] and not entity.registry.Q.all_of(tags=[pos, IsItem]).get_entities():
+            return Impossible("There is nothing here.")
+        return self
+
+    def execute(self, entity: Entity) -> ExecuteResult:
+        """Move an item from the floor to the entity."""
+        pos = entity.components[Position]
+        if pos.z.components[MapItems][pos.ij]:
+            item = game.map_tools.promote_item(pos.z, pos.ij)
+        else:
+            item = next(iter(entity.registry.Q.all_of(tags=[pos, IsItem])))
+        del item.components[Position]
+        item.relation_tag[ChildOf] = entity
+        return Done()
+
+
+def is_walkable(pos: Position) -> bool:
+    """Return True if `pos` can be moved onto without digging."""
+    tiles = pos.z.components[MapTiles]
+    return 0 <= pos.y < tiles.shape[0] and 0 <= pos.x < tiles.shape[1] and bool(TILE_DB["move_cost"][tiles[pos.ij]])
+
+
+class Lookout:
+    """Detect other entities coming into view of a traveling entity."""
+
+    def __init__(self, entity: Entity) -> None:
+        """Track the static items and visible entities on the same map as `entity`.
+
+        These are assumed not to move during travel.
+        """
+        pos = entity.components[Position]
+        others = [
+            other.components[Position]
+            for other in entity.registry.Q.all_of(components=[Position, Graphic], relations=[(ChildOf, pos.z)])
+            if other != entity
+        ]
+        items_i, items_j = pos.z.components[MapItems].nonzero()
+        self.x: NDArray[np.intc] = np.concatenate([items_j, [other.x for other in others]]).astype(np.intc)
+        self.y: NDArray[np.intc] = np.concatenate([items_i, [other.y for other in others]]).astype(np.intc)
+        self.seen = self._in_view(pos)
+
+    def _in_view(self, pos: Position) -> NDArray[np.bool_]:
+        """Return a mask of the tracked entities in view of `pos`."""
+        slice_i, slice_j = game.map_tools.get_view_slices(pos)
+        in_view: NDArray[np.bool_] = (
+            (slice_i.start <= self.y) & (self.y < slice_i.stop) & (slice_j.start <= self.x) & (self.x < slice_j.stop)
+        )
+        return in_view
+
+    def spotted_new(self, pos: Position) -> bool:
+        """Return True if an entity not seen before is in view of `pos`."""
+        in_view = self._in_view(pos)
+        spotted = bool((in_view & ~self.seen).any())
+        self.seen |= in_view
+        return spotted
+
+
+def travel(entity: Entity, directions: Iterable[tuple[int, int]]) -> Done:
+    """Move `entity` along `directions`, digging as needed, until blocked or something new comes into view.
+
+    All moves are performed at once, so the screen is only redrawn after the travel is over.
+    """
+    lookout = Lookout(entity)
+    time_cost = 0
+    for step, direction in enumerate(directions):
+        if step >= MAX_TRAVEL_STEPS or not MoveAction(direction).plan(entity):
+            break
+        time_cost += int(MoveAction(direction).execute(entity).time_cost)
+        if lookout.spotted_new(entity.components[Position]):
+            break
+    return Done(time_cost)
+
+
+def get_travel_cost(tiles: NDArray[np.uint8]) -> NDArray[np.int16]:
+    """Return the cost of entering each tile, digging through walls if needed.  Zero means the tile can not be entered."""
+    move_cost: NDArray[np.int16] = TILE_DB["move_cost"][tiles]
+    dig_cost: NDArray[np.int16] = TILE_DB["dig_cost"][tiles]
+    return np.where(move_cost > 0, move_cost, dig_cost)
+
+
+def get_travel_pathfinder(pos: Position, window: tuple[slice, slice] | None = None) -> tcod.path.Pathfinder:
+    """Return a pathfinder rooted at `pos` which digs through walls when that is shorter than walking around.
+
+    If `window` is given then only that part of the map is searched and the pathfinder uses coordinates relative to it.
+    """
+    tiles = pos.z.components[MapTiles]
+    if window is None:
+        window = slice(0, tiles.shape[0]), slice(0, tiles.shape[1])
+    cost = get_travel_cost(tiles[window])
+    pathfinder = tcod.path.Pathfinder(tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3))
+    pathfinder.add_root((pos.y - window[0].start, pos.x - window[1].start))
+    return pathfinder
+
+
+def path_to_directions(path: NDArray[np.intc]) -> list[tuple[int, int]]:
+    """Convert a path of ij coordinates into a list of (x, y) directions."""
+    return [(dj, di) for di, dj in np.diff(path, axis=0).tolist()]
+
+
+@attrs.define
+class RunAction(Action):
+    """Move in a direction until something interesting happens."""
+
+    direction: tuple[int, int]
+
+    def plan(self, entity: Entity) -> PlanResult:
+        """Verify the first step."""
+        if not is_walkable(entity.components[Position] + self.direction):
+            return Impossible("Path is blocked.")
+        return self
+
+    def iter_directions(self, entity: Entity) -> Iterator[tuple[int, int]]:
+        """Yield the run direction until the next step would need digging."""
+        while is_walkable(entity.components[Position] + self.direction):
+            yield self.direction
+
+    def execute(self, entity: Entity) -> ExecuteResult:
+        """Run until blocked."""
+        return travel(entity, self.iter_directions(entity))
+
+
+@attrs.define
+class TravelAction(Action):
+    """Walk to a destination, digging through walls on the way."""
+
+    dest_ij: tuple[int, int]
+    path: list[tuple[int, int]] = attrs.field(factory=list, init=False)
+
+    def plan(self, entity: Entity) -> PlanResult:
+        """Find a path to the destination."""
+        pos = entity.components[Position]
+        dest = Position(self.dest_ij[1], self.dest_ij[0], pos.z)
+        if dest == pos:
+            return Impossible("Already there.")
+        tiles = pos.z.components[MapTiles]
+        if not (0 <= dest.y < tiles.shape[0] and 0 <= dest.x < tiles.shape[1]) or not get_travel_cost(tiles[dest.ij]):
+            return Impossible("Destination is blocked.")
+        self.path = path_to_directions(get_travel_pathfinder(pos).path_to(self.dest_ij))
+        if not self.path:
+            return Impossible("No path to destination.")
+        return self
+
+    def execute(self, entity: Entity) -> ExecuteResult:
+        """Follow the path."""
+        return travel(entity, self.path)
+
+
+@attrs.define
+class ExploreAction(Action):
+    """Walk or dig towards the nearest unexplored area until something interesting happens."""
+
+    path: list[tuple[int, int]] = attrs.field(factory=list, init=False)
+
+    def plan(self, entity: Entity) -> PlanResult:
+        """Find the way to the nearest unexplored area."""
+        if IsPlayer not in entity.tags:
+            return Impossible("Only the player keeps track of explored areas.")
+        path = self.nearest_unexplored(entity.components[Position])
+        if path is None:
+            return Impossible("Nothing left to explore.")
+        self.path = path
+        return self
+
+    @staticmethod
+    def nearest_unexplored(pos: Position) -> list[tuple[int, int]] | None:
+        """Return the directions to the nearest reachable unexplored tile other than `pos`, or None if none are left.
+
+        Walls can be dug through, so unexplored walls count as unexplored area.
+        The area around the view is searched first since searching the whole map is much slower.
+        """
+        view_i, view_j = game.map_tools.get_view_slices(pos)
+        near = (
+            slice(max(0, view_i.start - EXPLORE_MARGIN), view_i.stop + EXPLORE_MARGIN),
+            slice(max(0, view_j.start - EXPLORE_MARGIN), view_j.stop + EXPLORE_MARGIN),
+        )
+        for window in (near, None):
+            pathfinder = get_travel_pathfinder(pos, window)
+            pathfinder.resolve()
+            distance = pathfinder.distance
+            explored = pos.z.components[MapExplored]
+            root_ij = pos.ij
+            if window is not None:
+                explored = explored[window]
+                root_ij = (pos.y - window[0].start, pos.x - window[1].start)
+            unexplored = (distance != np.iinfo(distance.dtype).max) & ~explored
+            unexplored[root_ij] = False
+            if not unexplored.any():
+                continue
+            nearest_ij = np.unravel_index(np.where(unexplored, distance, distance.max()).argmin(), distance.shape)
+            return path_to_directions(pathfinder.path_to((int(nearest_ij[0]), int(nearest_ij[1]))))
+        return None
+
+    def iter_directions(self, entity: Entity) -> Iterator[tuple[int, int]]:
+        """Yield directions to one unexplored area after another."""
+        path: list[tuple[int, int]] | None = self.path
+        while path:
+            yield from path
+            path = self.nearest_unexplored(entity.components[Position])
+
+    def execute(self, entity: Entity) -> ExecuteResult:
+        """Explore until interrupted or there is nothing left to explore."""
+        return travel(entity, self.iter_directions(entity))
@@ -59,3 +59,9 @@ class Graphic:
 """Map shape (height, width)."""
 MapTiles = ("MapTiles", NDArray[np.uint8])
 """Map tile indexes."""
+MapExplored = ("MapExplored", NDArray[np.bool_])
+"""Map tiles which have been in view of the player."""
+MapItems = ("MapItems", NDArray[np.uint8])
+"""Static item indexes on each map tile, zero for no item.  Items are promoted to entities once interacted with."""
+ItemKind = ("ItemKind", int)
+"""An item entities index in the item database."""
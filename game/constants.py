@@ -4,3 +4,6 @@
 
 CONSOLE_SIZE = 80, 50
 """Console tile size in (columns, rows)."""
+
+FRAME_RATE = 60
+"""Frames presented per second while the simulation runs on its own thread."""
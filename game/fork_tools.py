@@ -0,0 +1,205 @@
+"""Speculative world changes which can be committed or discarded."""
+
+from __future__ import annotations
+
+from random import Random
+from types import TracebackType
+from typing import Any, Final, Self
+
+import numpy as np
+import tcod.ecs.callbacks
+from numpy.typing import NDArray
+from tcod.ecs import Entity, Registry
+from tcod.ecs.typing import ComponentKey
+
+from game.components import Graphic, MapExplored, MapItems, MapTiles, Position
+
+CHUNK_SIZE: Final = 16
+"""Width and height of the array chunks saved by forks."""
+
+TRACKED_COMPONENTS: Final[tuple[ComponentKey[Any], ...]] = (Position, Graphic)
+"""Components which forks restore when discarded."""
+
+FORKED_ARRAYS: Final[tuple[ComponentKey[NDArray[Any]], ...]] = (MapTiles, MapItems, MapExplored)
+"""Array components which are read-only while a fork is open, they must be written with `get_writable`."""
+
+_MISSING: Final = object()
+"""Placeholder for components which did not exist before the fork."""
+
+
+class WorldFork:
+    """Speculative changes to a world which can be discarded or committed.
+
+    A fork is an in-place undo log rather than a copy: changes are made to the world itself, so only one line of
+    speculation can exist at a time and the world before the fork can not be read while it is open.
+    The first time a fork writes to something its original value is saved: arrays are saved per chunk and components
+    per entity.  Discarding the fork restores these values and committing it drops them, so both cost time
+    proportional to what was changed.
+
+    Restored are `TRACKED_COMPONENTS`, `FORKED_ARRAYS`, entities made with `new_entity`, and the world's `Random`
+    state.  Tags and relations mirrored from `Position` are restored with it.  Other tag and relation changes, and
+    entities made any other way, are not restored.
+    `FORKED_ARRAYS` are read-only while a fork is open so that writes which skip `get_writable` fail loudly.
+    Forks can be nested, only the most recent fork of a world is written to.
+
+    Example::
+
+        with WorldFork(world) as fork:
+            action.execute(player)
+            if is_good_outcome(player):
+                fork.commit()
+        # Otherwise the changes are discarded when leaving the block.
+    """
+
+    def __init__(self, world: Registry) -> None:
+        """Fork `world`, all further changes to `world` are recorded until this fork is committed or discarded."""
+        self.world = world
+        self.parent: WorldFork | None = world[None].components.get(ActiveFork)
+        self.is_open = True
+        self._rng_state = world[None].components[Random].getstate()
+        self.saved_components: dict[tuple[Entity, ComponentKey[Any]], object] = {}
+        """Original components by (entity, key)."""
+        self.saved_chunks: dict[tuple[Entity, ComponentKey[Any], int, int], NDArray[Any]] = {}
+        """Original array chunks by (entity, key, chunk_i, chunk_j)."""
+        self._is_saved: dict[tuple[Entity, ComponentKey[Any]], NDArray[np.bool_]] = {}
+        """Which chunks of each array are in `saved_chunks`, to skip checking them one by one."""
+        self.created: set[Entity] = set()
+        """Entities made with `new_entity` while this fork was active."""
+        self.writable: dict[tuple[Entity, ComponentKey[NDArray[Any]]], NDArray[Any]]
+        """Writable views of the `FORKED_ARRAYS` which are read-only while forks are open, shared by nested forks."""
+        self._locked: list[NDArray[Any]] = []
+        """Arrays made read-only by this fork, only the outermost fork locks arrays."""
+        if self.parent is not None:
+            self.writable = self.parent.writable
+        else:
+            self.writable = {}
+            for key in FORKED_ARRAYS:
+                for entity in world.Q.all_of(components=[key]):
+                    array = entity.components[key]
+                    if not array.flags.writeable:
+                        continue
+                    self.writable[entity, key] = array.view()
+                    array.flags.writeable = False
+                    self._locked.append(array)
+        world[None].components[ActiveFork] = self
+
+    def __enter__(self) -> Self:
+        """Return this fork."""
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Discard this fork unless it was already committed."""
+        if self.is_open:
+            self.discard()
+
+    def save_component(self, entity: Entity, key: ComponentKey[Any], old: object | None) -> None:
+        """Remember the value a component had before its first change in this fork."""
+        self.saved_components.setdefault((entity, key), _MISSING if old is None else old)
+
+    def save_chunks(self, entity: Entity, key: ComponentKey[Any], slices: tuple[slice, slice]) -> None:
+        """Remember the original values of the array chunks overlapping `slices`."""
+        array: NDArray[Any] = entity.components[key]
+        slice_i, slice_j = slices
+        chunks_i = slice(slice_i.start // CHUNK_SIZE, (slice_i.stop - 1) // CHUNK_SIZE + 1)
+        chunks_j = slice(slice_j.start // CHUNK_SIZE, (slice_j.stop - 1) // CHUNK_SIZE + 1)
+        is_saved = self._is_saved.get((entity, key))
+        if is_saved is None:
+            is_saved = self._is_saved[entity, key] = np.zeros(
+                (-(-array.shape[0] // CHUNK_SIZE), -(-array.shape[1] // CHUNK_SIZE)), dtype=bool
+            )
+        if is_saved[chunks_i, chunks_j].all():
+            return
+        for chunk_i in range(chunks_i.start, chunks_i.stop):
+            for chunk_j in range(chunks_j.start, chunks_j.stop):
+                chunk_key = (entity, key, chunk_i, chunk_j)
+                if chunk_key not in self.saved_chunks:
+                    self.saved_chunks[chunk_key] = array[_chunk_slices(chunk_i, chunk_j)].copy()
+        is_saved[chunks_i, chunks_j] = True
+
+    def _close(self) -> None:
+        """Stop recording changes, making the parent fork active again."""
+        assert self.is_open, "This fork was already closed."
+        assert self.world[None].components.get(ActiveFork) is self, "Nested forks must be closed first."
+        self.is_open = False
+        if self.parent is not None:
+            self.world[None].components[ActiveFork] = self.parent
+        else:
+            del self.world[None].components[ActiveFork]
+        for array in self._locked:
+            array.flags.writeable = True
+
+    def commit(self) -> None:
+        """Keep the changes made in this fork, passing them on to the parent fork if there is one."""
+        self._close()
+        if self.parent is None:
+            return
+        for component_key, old in self.saved_components.items():
+            self.parent.saved_components.setdefault(component_key, old)
+        for chunk_key, chunk in self.saved_chunks.items():
+            self.parent.saved_chunks.setdefault(chunk_key, chunk)
+        self.parent.created |= self.created
+
+    def discard(self) -> None:
+        """Undo the changes made in this fork."""
+        self._close()
+        # Restore values with no fork active, the parent fork already saved any original values it needs.
+        parent = self.world[None].components.pop(ActiveFork, None)
+        for (entity, key), old in self.saved_components.items():
+            if old is _MISSING:
+                entity.components.pop(key, None)
+            else:
+                entity.components[key] = old
+        for (entity, key, chunk_i, chunk_j), chunk in self.saved_chunks.items():
+            self.writable[entity, key][_chunk_slices(chunk_i, chunk_j)] = chunk
+        for entity in self.created:
+            entity.clear()
+        self.world[None].components[Random].setstate(self._rng_state)
+        if parent is not None:
+            self.world[None].components[ActiveFork] = parent
+
+
+ActiveFork: Final = ("ActiveFork", WorldFork)
+"""The most recent open fork of a world, stored on the global entity."""
+
+
+def _chunk_slices(chunk_i: int, chunk_j: int) -> tuple[slice, slice]:
+    """Return the array slices for a chunk index."""
+    return (
+        slice(chunk_i * CHUNK_SIZE, (chunk_i + 1) * CHUNK_SIZE),
+        slice(chunk_j * CHUNK_SIZE, (chunk_j + 1) * CHUNK_SIZE),
+    )
+
+
+def get_writable(entity: Entity, key: ComponentKey[NDArray[Any]], slices: tuple[slice, slice]) -> NDArray[Any]:
+    """Return a writable view of `slices` of an array component, first saving it to the active fork if there is one."""
+    fork = entity.registry[None].components.get(ActiveFork)
+    if fork is None or (entity, key) not in fork.writable:
+        array: NDArray[Any] = entity.components[key]
+        return array[slices]
+    fork.save_chunks(entity, key, slices)
+    return fork.writable[entity, key][slices]
+
+
+def new_entity(world: Registry) -> Entity:
+    """Return a new entity, which will be cleared if the active fork is discarded."""
+    entity = world[object()]
+    fork = world[None].components.get(ActiveFork)
+    if fork is not None:
+        fork.created.add(entity)
+    return entity
+
+
+def _track_component(key: ComponentKey[Any]) -> None:
+    """Register a callback saving changes of `key` to the active fork."""
+
+    @tcod.ecs.callbacks.register_component_changed(component=key)
+    def on_tracked_component_changed(entity: Entity, old: object | None, _new: object | None) -> None:
+        fork = entity.registry[None].components.get(ActiveFork)
+        if fork is not None:
+            fork.save_component(entity, key, old)
+
+
+for _key in TRACKED_COMPONENTS:
+    _track_component(_key)
@@ -0,0 +1,31 @@
+"""Item database."""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+ITEM_DTYPE = np.dtype(
+    [
+        ("name", object),
+        ("ch", np.intc),
+        ("fg", "3B"),
+    ]
+)
+
+
+class _Item(NamedTuple):
+    name: str
+    ch: int
+    fg: tuple[int, int, int] = (255, 255, 255)
+
+
+ITEM_DB = np.array(
+    [
+        _Item(name="none", ch=0),  # Index zero means there is no item.
+        _Item(name="gold", ch=ord("$")),
+    ],
+    dtype=ITEM_DTYPE,
+)
+ITEMS = {str(item["name"]): i for i, item in enumerate(ITEM_DB)}
@@ -8,14 +8,62 @@
 
 import numpy as np
 import scipy.ndimage  # type: ignore[import-untyped]
+import tcod.camera
 import tcod.noise
 from numpy.typing import NDArray
 from tcod.ecs import Entity, Registry
 
-from game.components import Graphic, MapShape, MapTiles, Position
-from game.tags import IsStart
+import game.fork_tools
+from game.components import Graphic, ItemKind, MapExplored, MapItems, MapShape, MapTiles, Position
+from game.constants import CONSOLE_SIZE
+from game.items import ITEM_DB, ITEMS
+from game.tags import IsItem, IsStart
 from game.tiles import TILES
 
+VIEW_SHAPE: Final = CONSOLE_SIZE[1], CONSOLE_SIZE[0]
+"""Shape (height, width) of the area around the player which is in view."""
+
+
+def get_camera(pos: Position, screen_shape: tuple[int, int] = VIEW_SHAPE) -> tuple[int, int]:
+    """Return the (y, x) camera offset of a view centered on `pos`."""
+    camera_y, camera_x = tcod.camera.get_camera(screen_shape, pos.ij, (pos.z.components[MapShape], 0.5))
+    return camera_y, camera_x
+
+
+def get_view_slices(pos: Position, screen_shape: tuple[int, int] = VIEW_SHAPE) -> tuple[slice, slice]:
+    """Return the ij slices of the map in view of `pos`."""
+    _, (slice_i, slice_j) = tcod.camera.get_slices(
+        screen_shape, pos.z.components[MapShape], get_camera(pos, screen_shape)
+    )
+    return slice_i, slice_j
+
+
+def mark_explored(pos: Position) -> None:
+    """Mark the tiles in view of `pos` as explored."""
+    view_slices = get_view_slices(pos)
+    game.fork_tools.get_writable(pos.z, MapExplored, view_slices)[:] = True
+
+
+def set_tile(map_: Entity, ij: tuple[int, int], tile: int) -> None:
+    """Change the tile at `ij` on a map."""
+    i, j = ij
+    game.fork_tools.get_writable(map_, MapTiles, (slice(i, i + 1), slice(j, j + 1)))[:] = tile
+
+
+def promote_item(map_: Entity, ij: tuple[int, int]) -> Entity:
+    """Move the static item at `ij` into a new entity and return it."""
+    i, j = ij
+    kind = int(map_.components[MapItems][i, j])
+    assert kind, f"No item at {ij}."
+    game.fork_tools.get_writable(map_, MapItems, (slice(i, i + 1), slice(j, j + 1)))[:] = 0
+
+    item = game.fork_tools.new_entity(map_.registry)
+    item.components[Position] = Position(j, i, map_)
+    item.components[Graphic] = Graphic(int(ITEM_DB["ch"][kind]), tuple(ITEM_DB["fg"][kind].tolist()))
+    item.components[ItemKind] = kind
+    item.tags.add(IsItem)
+    return item
+
 
 def iter_random_walk(rng: Random, start: tuple[int, int]) -> Iterator[tuple[int, int]]:
     """Iterate over tiles of a random walk."""
@@ -55,6 +103,8 @@ def new_map(world: Registry) -> Entity:
     shape = map_.components[MapShape] = (512, 512)
     center_ij = shape[0] // 2, shape[1] // 2
     tiles = map_.components[MapTiles] = np.zeros(shape=shape, dtype=np.uint8)
+    map_.components[MapExplored] = np.zeros(shape=shape, dtype=bool)
+    items = map_.components[MapItems] = np.zeros(shape=shape, dtype=np.uint8)
 
     rng = world[None].components[Random]
     n_open = tcod.noise.Noise(2, seed=rng.getrandbits(32))
@@ -87,8 +137,7 @@ def new_map(world: Registry) -> Entity:
     start.tags |= {IsStart}
 
     for zone in zones:
-        item = world[object()]
-        item.components[Position] = Position(*zone.random_tile_xy(rng), map_)
-        item.components[Graphic] = Graphic(ord("$"))
+        x, y = zone.random_tile_xy(rng)
+        items[y, x] = ITEMS["gold"]
 
     return map_
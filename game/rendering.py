@@ -2,33 +2,106 @@
 
 from __future__ import annotations
 
+from typing import TypeVar
+
+import attrs
 import numpy as np
 import tcod.camera
 import tcod.console
+from numpy.typing import NDArray
 from tcod.ecs import Registry
 
-from game.components import Graphic, MapTiles, Position
+import game.map_tools
+from game.components import Graphic, MapItems, MapTiles, Position
+from game.items import ITEM_DB
 from game.tags import IsPlayer
 from game.tiles import TILE_DB
 
+T = TypeVar("T", bound=np.generic)
+
+
+@attrs.frozen
+class RenderSnapshot:
+    """An immutable copy of everything needed to draw the in-game screen.
+
+    Snapshots hold no references to the world so they can be drawn while the world is being modified.
+    """
+
+    tiles: NDArray[np.void]
+    """Graphics of the visible tile window, in screen space."""
+    sprites_x: NDArray[np.intc]
+    """Screen x coordinates of visible sprites."""
+    sprites_y: NDArray[np.intc]
+    """Screen y coordinates of visible sprites."""
+    sprites_ch: NDArray[np.intc]
+    """Codepoints of visible sprites."""
+    sprites_fg: NDArray[np.uint8]
+    """Foreground colors of visible sprites."""
+    hud: str
+    """Status text."""
+    camera: tuple[int, int]
+    """World (y, x) coordinates of the top-left screen tile."""
+
+
+def _readonly(array: NDArray[T]) -> NDArray[T]:
+    """Mark an array as read-only and return it."""
+    array.flags.writeable = False
+    return array
 
-def render_map(world: Registry, console: tcod.console.Console) -> None:
-    """Draw the visible map."""
+
+def take_snapshot(world: Registry, screen_shape: tuple[int, int]) -> RenderSnapshot:
+    """Return a snapshot of the visible map centered on the player, `screen_shape` is (height, width)."""
     (player,) = world.Q.all_of(tags=[IsPlayer])
     center_pos = player.components[Position]
     tiles = center_pos.z.components[MapTiles]
-    screen_shape = console.height, console.width
-    camera_y, camera_x = tcod.camera.get_camera(screen_shape, center_pos.ij, (tiles.shape, 0.5))
+    camera_y, camera_x = game.map_tools.get_camera(center_pos, screen_shape)
 
     screen_slices, world_slices = tcod.camera.get_slices(screen_shape, tiles.shape, (camera_y, camera_x))
 
-    console.rgb[screen_slices] = np.choose(tiles[world_slices], TILE_DB["graphic"])
+    screen_tiles = np.zeros(screen_shape, dtype=tcod.console.rgb_graphic)
+    screen_tiles[screen_slices] = np.choose(tiles[world_slices], TILE_DB["graphic"])
+
+    # Static items are drawn first so that entities are drawn over them.
+    items = center_pos.z.components[MapItems][world_slices]
+    items_i, items_j = items.nonzero()
+    items_kind = items[items_i, items_j]
+    sprites_x = [items_j + screen_slices[1].start]
+    sprites_y = [items_i + screen_slices[0].start]
+    sprites_ch = [ITEM_DB["ch"][items_kind]]
+    sprites_fg = [ITEM_DB["fg"][items_kind]]
 
     for entity in world.Q.all_of(components=[Position, Graphic]):
         pos = entity.components[Position]
         entity_x = pos.x - camera_x
         entity_y = pos.y - camera_y
-        if not (0 <= entity_x < console.width and 0 <= entity_y < console.height):
+        if not (0 <= entity_x < screen_shape[1] and 0 <= entity_y < screen_shape[0]):
             continue
         graphic = entity.components[Graphic]
-        console.rgb[["ch", "fg"]][entity_y, entity_x] = graphic.ch, graphic.fg
+        sprites_x.append(np.array([entity_x]))
+        sprites_y.append(np.array([entity_y]))
+        sprites_ch.append(np.array([graphic.ch]))
+        sprites_fg.append(np.array([graphic.fg]))
+
+    return RenderSnapshot(
+        tiles=_readonly(screen_tiles),
+        sprites_x=_readonly(np.concatenate(sprites_x).astype(np.intc)),
+        sprites_y=_readonly(np.concatenate(sprites_y).astype(np.intc)),
+        sprites_ch=_readonly(np.concatenate(sprites_ch).astype(np.intc)),
+        sprites_fg=_readonly(np.concatenate(sprites_fg).astype(np.uint8)),
+        hud=str(center_pos),
+        camera=(camera_y, camera_x),
+    )
+
+
+def render_snapshot(snapshot: RenderSnapshot, console: tcod.console.Console) -> None:
+    """Draw a snapshot to a console."""
+    height = min(console.height, snapshot.tiles.shape[0])
+    width = min(console.width, snapshot.tiles.shape[1])
+    console.rgb[:height, :width] = snapshot.tiles[:height, :width]
+
+    in_bounds = (snapshot.sprites_x < width) & (snapshot.sprites_y < height)
+    sprites_ij = snapshot.sprites_y[in_bounds], snapshot.sprites_x[in_bounds]
+    console.rgb["ch"][sprites_ij] = snapshot.sprites_ch[in_bounds]
+    console.rgb["fg"][sprites_ij] = snapshot.sprites_fg[in_bounds]
+
+    console.print(0, 0, snapshot.hud, fg=(255, 255, 255), bg=(0, 0, 0))
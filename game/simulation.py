@@ -0,0 +1,114 @@
+"""Threaded simulation which runs apart from the main thread."""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+from tcod.ecs import Registry
+
+import g
+import game.action_tools
+from game.action import Planner
+from game.map_tools import VIEW_SHAPE
+from game.rendering import RenderSnapshot, take_snapshot
+from game.tags import IsPlayer
+
+
+class SnapshotBuffer:
+    """Double buffer of render snapshots.
+
+    The simulation thread writes to the back buffer and then swaps it to the front, the main thread only reads the front.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty buffer."""
+        self._lock = threading.Lock()
+        self._buffers: list[RenderSnapshot | None] = [None, None]
+        self._front = 0
+
+    @property
+    def front(self) -> RenderSnapshot | None:
+        """The most recently published snapshot."""
+        with self._lock:
+            return self._buffers[self._front]
+
+    def publish(self, snapshot: RenderSnapshot) -> None:
+        """Write `snapshot` to the back buffer and then swap buffers."""
+        back = 1 - self._front
+        self._buffers[back] = snapshot
+        with self._lock:
+            self._front = back
+
+
+class Simulation:
+    """Runs player actions on `g.world` from a worker thread.
+
+    The main thread must not access `g.world` directly while the simulation is running.
+    It submits actions with `submit` and draws from `snapshot` instead.
+    If an action raises an exception then the simulation stops and the error is raised again from `snapshot` and
+    `submit` on the main thread.
+    """
+
+    def __init__(self, screen_shape: tuple[int, int] = VIEW_SHAPE) -> None:
+        """Initialize the simulation, `screen_shape` is the (height, width) of published snapshots."""
+        self.screen_shape = screen_shape
+        self.buffer = SnapshotBuffer()
+        self.world_lock = threading.Lock()
+        """Must be held by any thread accessing `g.world`."""
+        self._queue: queue.SimpleQueue[Planner | Registry | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="Simulation", daemon=True)
+        self._error: BaseException | None = None
+
+    @property
+    def snapshot(self) -> RenderSnapshot | None:
+        """The latest published snapshot, or None if no world exists yet."""
+        self._check_error()
+        return self.buffer.front
+
+    def start(self) -> None:
+        """Start the simulation thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the simulation thread after it finishes any pending actions."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, action: Planner) -> None:
+        """Queue an action to be performed by the player."""
+        self._check_error()
+        self._queue.put(action)
+
+    def replace_world(self, world: Registry) -> None:
+        """Queue `g.world` to be replaced with `world`, its first snapshot is published once it is in use.
+
+        This does not wait for the simulation thread so that the main thread stays responsive during long actions.
+        """
+        self._check_error()
+        self._queue.put(world)
+
+    def _check_error(self) -> None:
+        """Raise the error which stopped the simulation thread, if any."""
+        if self._error is not None:
+            msg = "The simulation thread stopped because of an error."
+            raise RuntimeError(msg) from self._error
+
+    def _publish(self) -> None:
+        """Publish a snapshot of `g.world`, `world_lock` must be held."""
+        self.buffer.publish(take_snapshot(g.world, self.screen_shape))
+
+    def _run(self) -> None:
+        """Perform queued actions and world replacements until stopped or an action fails."""
+        try:
+            while (item := self._queue.get()) is not None:
+                with self.world_lock:
+                    if isinstance(item, Registry):
+                        g.world = item
+                    else:
+                        (player,) = g.world.Q.all_of(tags=[IsPlayer])
+                        game.action_tools.do_action(player, item)
+                    if self._queue.empty():  # Skip snapshots which would be immediately replaced.
+                        self._publish()
+        except BaseException as error:  # noqa: BLE001
+            self._error = error
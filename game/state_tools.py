@@ -5,7 +5,7 @@
 import tcod.console
 
 import g
-from game.constants import CONSOLE_SIZE
+from game.constants import CONSOLE_SIZE, FRAME_RATE
 from game.state import Pop, Push, Rebase, StateResult
 
 
@@ -36,10 +36,13 @@ def apply_state_result(result: StateResult) -> None:
 
 
 def main_loop() -> None:
-    """Run the active state forever."""
+    """Run the active state forever.
+
+    With a threaded simulation the screen is redrawn at `FRAME_RATE` even without events, to show its latest snapshot.
+    """
     while g.states:
         main_draw()
-        for event in tcod.event.wait():
+        for event in tcod.event.wait(timeout=None if g.simulation is None else 1 / FRAME_RATE):
             tile_event = g.context.convert_event(event)
             if g.states:
                 apply_state_result(g.states[-1].on_event(tile_event))
@@ -8,15 +8,14 @@
 import attrs
 import tcod.console
 import tcod.event
-from tcod.ecs import Entity
 from tcod.event import KeySym
 
 import g
+import game.action_tools
 import game.actions
 import game.rendering
 import game.world_tools
-from game.action import Impossible, Planner
-from game.components import Position
+from game.action import Planner
 from game.state import Pop, Push, Rebase, State, StateResult
 from game.tags import IsPlayer
 
@@ -52,29 +51,38 @@
 }
 
 
-def do_action(entity: Entity, action: Planner) -> StateResult:
-    """Perform an action."""
-    plan_result = action.plan(entity)
-    match plan_result:
-        case Impossible(reason=_reason):
-            pass
-        case _:
-            plan_result.execute(entity)
-    return None
+def do_player_action(action: Planner) -> StateResult:
+    """Perform an action as the player, deferring to the simulation thread if one is running."""
+    if g.simulation is not None:
+        g.simulation.submit(action)
+        return None
+    (player,) = g.world.Q.all_of(tags=[IsPlayer])
+    return game.action_tools.do_action(player, action)
 
 
 @attrs.define(eq=False)
 class InGame(State):
     """Primary in-game state."""
 
-    def on_event(self, event: tcod.event.Event) -> StateResult:
+    snapshot: game.rendering.RenderSnapshot | None = None
+    """The last drawn snapshot, used to convert mouse positions to world coordinates."""
+
+    def on_event(self, event: tcod.event.Event) -> StateResult:  # noqa: PLR0911
         """Handle events for the in-game state."""
-        (player,) = g.world.Q.all_of(tags=[IsPlayer])
         match event:
             case tcod.event.Quit():
                 raise SystemExit
+            case tcod.event.KeyDown(sym=sym, mod=mod) if sym in DIRECTION_KEYS and mod & tcod.event.Modifier.SHIFT:
+                return do_player_action(game.actions.RunAction(DIRECTION_KEYS[sym]))
             case tcod.event.KeyDown(sym=sym) if sym in DIRECTION_KEYS:
-                return do_action(player, game.actions.BumpAction(DIRECTION_KEYS[sym]))
+                return do_player_action(game.actions.BumpAction(DIRECTION_KEYS[sym]))
+            case tcod.event.KeyDown(sym=KeySym.g):
+                return do_player_action(game.actions.PickupAction())
+            case tcod.event.KeyDown(sym=KeySym.o):
+                return do_player_action(game.actions.ExploreAction())
+            case tcod.event.MouseButtonUp(button=tcod.event.MouseButton.LEFT, position=(x, y)) if self.snapshot:
+                camera_y, camera_x = self.snapshot.camera
+                return do_player_action(game.actions.TravelAction((int(y) + camera_y, int(x) + camera_x)))
             case tcod.event.KeyDown(sym=KeySym.ESCAPE):
                 return Push(MainMenu())
             case _:
@@ -82,9 +90,14 @@ def on_event(self, event: tcod.event.Event) -> StateResult:
 
     def on_draw(self, console: tcod.console.Console) -> None:
         """Draw the standard screen."""
-        (player,) = g.world.Q.all_of(tags=[IsPlayer])
-        game.rendering.render_map(g.world, console)
-        console.print(0, 0, str(player.components[Position]), fg=(255, 255, 255), bg=(0, 0, 0))
+        if g.simulation is not None:
+            snapshot = g.simulation.snapshot
+            if snapshot is None:
+                return
+        else:
+            snapshot = game.rendering.take_snapshot(g.world, (console.height, console.width))
+        self.snapshot = snapshot
+        game.rendering.render_snapshot(snapshot, console)
 
 
 @attrs.define()
@@ -187,7 +200,10 @@ def continue_(self) -> StateResult:
 
     def new_game(self) -> StateResult:
         """Begin a new game."""
-        g.world = game.world_tools.new_world()
+        if g.simulation is not None:
+            g.simulation.replace_world(game.world_tools.new_world())
+        else:
+            g.world = game.world_tools.new_world()
         return Rebase(InGame())
 
     def quit(self) -> StateResult:
@@ -24,5 +24,6 @@ def new_world() -> Registry:
     player.components[Position] = start.components[Position]
     player.components[Graphic] = Graphic(ord("@"))
     player.tags |= {IsPlayer, IsActor}
+    game.map_tools.mark_explored(player.components[Position])
 
     return world
@@ -3,11 +3,14 @@
 
 from __future__ import annotations
 
+import argparse
+
 import tcod.console
 import tcod.context
 import tcod.tileset
 
 import g
+import game.simulation
 import game.state_tools
 import game.states
 from game.constants import CONSOLE_SIZE
@@ -15,13 +18,24 @@
 
 def main() -> None:
     """Entry point function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threaded", action="store_true", help="run the simulation on its own thread")
+    args = parser.parse_args()
+
     tileset = tcod.tileset.load_tilesheet(
         "data/Alloy_curses_12x12.png", columns=16, rows=16, charmap=tcod.tileset.CHARMAP_CP437
     )
     tcod.tileset.procedural_block_elements(tileset=tileset)
     g.states = [game.states.MainMenu()]
-    with tcod.context.new(columns=CONSOLE_SIZE[0], rows=CONSOLE_SIZE[1], tileset=tileset) as g.context:
-        game.state_tools.main_loop()
+    if args.threaded:
+        g.simulation = game.simulation.Simulation()
+        g.simulation.start()
+    try:
+        with tcod.context.new(columns=CONSOLE_SIZE[0], rows=CONSOLE_SIZE[1], tileset=tileset) as g.context:
+            game.state_tools.main_loop()
+    finally:
+        if g.simulation is not None:
+            g.simulation.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Tests for this program."""
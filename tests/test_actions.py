@@ -0,0 +1,114 @@
+"""Tests for travel actions on generated worlds."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from tcod.ecs import Entity, Registry
+
+import game.world_tools
+from game.action import Impossible
+from game.actions import ExploreAction, RunAction, TravelAction, is_walkable
+from game.components import MapExplored, MapItems, MapTiles, Position
+from game.tags import IsPlayer
+from game.tiles import TILE_DB
+
+DIRECTIONS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+@pytest.fixture
+def world() -> Registry:
+    """Return a new world."""
+    return game.world_tools.new_world()
+
+
+def get_player(world: Registry) -> Entity:
+    """Return the player entity."""
+    (player,) = world.Q.all_of(tags=[IsPlayer])
+    return player
+
+
+def distance(a: Position, b_ij: tuple[int, int]) -> int:
+    """Return the chebyshev distance from `a` to `b_ij`."""
+    return max(abs(a.y - b_ij[0]), abs(a.x - b_ij[1]))
+
+
+def get_item_destination(pos: Position) -> tuple[int, int]:
+    """Return the position of an item in another cave which is at least 50 tiles away from `pos`."""
+    tiles = pos.z.components[MapTiles]
+    items_i, items_j = pos.z.components[MapItems].nonzero()
+    for ij in zip(items_i.tolist(), items_j.tolist(), strict=True):
+        if TILE_DB["move_cost"][tiles[ij]] and distance(pos, ij) >= 50:  # noqa: PLR2004
+            return ij
+    raise AssertionError
+
+
+def test_run(world: Registry) -> None:
+    """Running moves along open floor and stops before walls."""
+    player = get_player(world)
+    start = player.components[Position]
+    direction = next(direction for direction in DIRECTIONS if is_walkable(start + direction))
+    tiles = start.z.components[MapTiles].copy()
+    result = RunAction(direction).plan(player)
+    assert not isinstance(result, Impossible)
+    result.execute(player)
+    assert player.components[Position] != start
+    assert np.array_equal(start.z.components[MapTiles], tiles), "Running should never dig."
+
+
+def test_travel_out_of_cave(world: Registry) -> None:
+    """Traveling to another cave digs towards it."""
+    player = get_player(world)
+    start = player.components[Position]
+    dest_ij = get_item_destination(start)
+    start.z.components[MapItems][:] = 0  # Nothing to interrupt the travel.
+
+    result = TravelAction(dest_ij).plan(player)
+    assert not isinstance(result, Impossible)
+    result.execute(player)
+    assert player.components[Position].ij == dest_ij
+
+
+def test_travel_interrupted(world: Registry) -> None:
+    """Travel stops somewhere along its path when items come into view."""
+    player = get_player(world)
+    start = player.components[Position]
+    dest_ij = get_item_destination(start)
+
+    action = TravelAction(dest_ij)
+    assert not isinstance(action.plan(player), Impossible)
+    path_ij = [tuple(ij) for ij in (np.cumsum(np.array(action.path)[:, ::-1], axis=0) + start.ij).tolist()]
+    action.execute(player)
+    assert player.components[Position].ij in path_ij
+
+
+def test_explore(world: Registry) -> None:
+    """Exploring leaves the starting cave and reveals new tiles."""
+    player = get_player(world)
+    start = player.components[Position]
+    start.z.components[MapItems][:] = 0
+    explored = int(start.z.components[MapExplored].sum())
+
+    result = ExploreAction().plan(player)
+    assert not isinstance(result, Impossible)
+    result.execute(player)
+    pos = player.components[Position]
+    assert pos != start
+    assert not TILE_DB["dig_cost"][start.z.components[MapTiles][pos.ij]]
+    assert start.z.components[MapExplored].sum() > explored
+
+
+def test_explore_non_player(world: Registry) -> None:
+    """Only the player can explore since only the player marks tiles as explored."""
+    player = get_player(world)
+    explorer = world[object()]
+    explorer.components[Position] = player.components[Position]
+    assert isinstance(ExploreAction().plan(explorer), Impossible)
+
+
+def test_nearest_unexplored_skips_own_tile(world: Registry) -> None:
+    """An unexplored tile under the explorer is not returned as an empty path."""
+    pos = get_player(world).components[Position]
+    pos.z.components[MapExplored][:] = False
+    path = ExploreAction.nearest_unexplored(pos)
+    assert path
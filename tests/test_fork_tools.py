@@ -0,0 +1,133 @@
+"""Tests for world forks."""
+
+from __future__ import annotations
+
+from random import Random
+
+import numpy as np
+import pytest
+from tcod.ecs import Entity, Registry
+
+import game.world_tools
+from game.actions import MoveAction, PickupAction
+from game.components import ItemKind, MapExplored, MapItems, MapTiles, Position
+from game.fork_tools import ActiveFork, WorldFork, new_entity
+from game.tags import ChildOf, IsItem, IsPlayer
+from game.tiles import TILES
+
+RIGHT = (1, 0)
+
+
+@pytest.fixture
+def world() -> Registry:
+    """Return a new world with a diggable wall to the right of the player."""
+    world = game.world_tools.new_world()
+    (player,) = world.Q.all_of(tags=[IsPlayer])
+    pos = player.components[Position]
+    pos.z.components[MapTiles][pos.y, pos.x + 1 : pos.x + 4] = TILES["loam wall"]
+    return world
+
+
+def get_player(world: Registry) -> Entity:
+    """Return the player entity."""
+    (player,) = world.Q.all_of(tags=[IsPlayer])
+    return player
+
+
+def move(player: Entity, direction: tuple[int, int]) -> None:
+    """Move the player, digging if needed."""
+    MoveAction(direction).execute(player)
+
+
+def test_nested_discard(world: Registry) -> None:
+    """Discarding the outer fork undoes the changes committed from the inner fork."""
+    player = get_player(world)
+    pos = player.components[Position]
+    tiles = pos.z.components[MapTiles].copy()
+    explored = pos.z.components[MapExplored].copy()
+    rng_state = world[None].components[Random].getstate()
+
+    with WorldFork(world) as outer:
+        move(player, RIGHT)
+        with WorldFork(world) as inner:
+            move(player, RIGHT)
+            world[None].components[Random].random()
+            inner.commit()
+        outer.discard()
+
+    assert ActiveFork not in world[None].components
+    assert player.components[Position] == pos
+    assert player in set(world.Q.all_of(tags=[pos]))
+    assert player not in set(world.Q.all_of(tags=[pos + RIGHT]))
+    assert player not in set(world.Q.all_of(tags=[pos + RIGHT + RIGHT]))
+    assert player.relation_tag[ChildOf] == pos.z
+    assert np.array_equal(pos.z.components[MapTiles], tiles)
+    assert np.array_equal(pos.z.components[MapExplored], explored)
+    assert world[None].components[Random].getstate() == rng_state
+
+
+def test_nested_commit(world: Registry) -> None:
+    """Discarding an inner fork keeps the changes made by the outer fork before it."""
+    player = get_player(world)
+    pos = player.components[Position]
+    tiles = pos.z.components[MapTiles]
+
+    with WorldFork(world) as outer:
+        move(player, RIGHT)
+        dug = tiles.copy()
+        with WorldFork(world):
+            move(player, RIGHT)
+        assert player.components[Position] == pos + RIGHT
+        assert np.array_equal(tiles, dug)
+        outer.commit()
+
+    assert ActiveFork not in world[None].components
+    assert player.components[Position] == pos + RIGHT
+    assert tiles[pos.y, pos.x + 1] == TILES["loam floor"]
+    assert tiles[pos.y, pos.x + 2] == TILES["loam wall"]
+
+
+def test_created_entities(world: Registry) -> None:
+    """Entities made with new_entity are cleared when their fork is discarded, including through a parent."""
+    with WorldFork(world):
+        with WorldFork(world) as inner:
+            kept = new_entity(world)
+            kept.components[int] = 1
+            inner.commit()
+        with WorldFork(world):
+            discarded = new_entity(world)
+            discarded.components[int] = 2
+        assert int not in discarded.components
+        assert kept.components[int] == 1
+    assert int not in kept.components
+
+
+def test_discard_pickup(world: Registry) -> None:
+    """Discarding a pickup puts the static item back without leaving its promoted entity behind."""
+    player = get_player(world)
+    pos = player.components[Position]
+    items = pos.z.components[MapItems]
+    items[pos.ij] = 1
+
+    with WorldFork(world) as outer:
+        with WorldFork(world) as inner:
+            PickupAction().execute(player)
+            assert not items[pos.ij]
+            inner.commit()
+        assert set(world.Q.all_of(components=[ItemKind]))
+        outer.discard()
+
+    assert items[pos.ij] == 1
+    assert not set(world.Q.all_of(components=[ItemKind]))
+    assert not set(world.Q.all_of(tags=[IsItem]))
+    assert not set(world.Q.all_of(relations=[(ChildOf, player)]))
+
+
+def test_untracked_write_fails(world: Registry) -> None:
+    """Forked arrays can only be written through get_writable while a fork is open."""
+    player = get_player(world)
+    pos = player.components[Position]
+    for key in (MapTiles, MapItems, MapExplored):
+        with WorldFork(world), WorldFork(world), pytest.raises(ValueError, match="read-only"):
+            pos.z.components[key][pos.ij] = 1
+        pos.z.components[key][pos.ij] = 1  # Writable again once all forks are closed.
@@ -0,0 +1,112 @@
+"""Tests for the threaded simulation."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+import pytest
+from tcod.ecs import Entity
+
+import g
+import game.world_tools
+from game.action import Done, ExecuteResult, PlanResult
+from game.actions import MoveAction
+from game.components import MapTiles, Position
+from game.rendering import RenderSnapshot
+from game.simulation import Simulation
+from game.tags import IsPlayer
+from game.tiles import TILES
+
+TIMEOUT = 5.0
+"""Seconds to wait for the simulation thread."""
+
+RIGHT = (1, 0)
+
+
+def wait_for(condition: Callable[[], bool]) -> None:
+    """Wait until `condition` returns True."""
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the simulation."
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def simulation() -> Iterator[Simulation]:
+    """Return a running simulation of a new world."""
+    sim = Simulation()
+    sim.start()
+    sim.replace_world(game.world_tools.new_world())
+    wait_for(lambda: sim.snapshot is not None)
+    yield sim
+    sim.stop()
+
+
+def get_player() -> Entity:
+    """Return the player entity of `g.world`."""
+    (player,) = g.world.Q.all_of(tags=[IsPlayer])
+    return player
+
+
+class _BlockingAction:
+    """Holds the simulation thread until released."""
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def plan(self, _entity: Entity) -> PlanResult:
+        return self
+
+    def execute(self, _entity: Entity) -> ExecuteResult:
+        self.started.set()
+        self.release.wait(TIMEOUT)
+        return Done()
+
+
+class _FailingAction:
+    """Always fails."""
+
+    def plan(self, _entity: Entity) -> PlanResult:
+        raise ValueError
+
+
+def test_submit_publishes(simulation: Simulation) -> None:
+    """Submitted actions are performed and a new snapshot is published."""
+    with simulation.world_lock:
+        player = get_player()
+        pos = player.components[Position]
+        pos.z.components[MapTiles][pos.y, pos.x + 1] = TILES["rock floor"]
+    first: RenderSnapshot | None = simulation.snapshot
+    simulation.submit(MoveAction(RIGHT))
+    wait_for(lambda: simulation.snapshot is not first)
+    with simulation.world_lock:
+        assert player.components[Position] == pos + RIGHT
+    assert simulation.snapshot is not None
+    assert simulation.snapshot.hud == str(pos + RIGHT)
+
+
+def test_replace_world_does_not_block(simulation: Simulation) -> None:
+    """Replacing the world returns while a long action is running and applies the world afterwards."""
+    blocking = _BlockingAction()
+    simulation.submit(blocking)
+    assert blocking.started.wait(TIMEOUT)
+    world = game.world_tools.new_world()
+    start = time.monotonic()
+    simulation.replace_world(world)
+    assert time.monotonic() - start < TIMEOUT / 2
+    assert g.world is not world
+    blocking.release.set()
+    wait_for(lambda: g.world is world)
+
+
+def test_error_propagates(simulation: Simulation) -> None:
+    """Errors from the simulation thread are raised again on the calling thread."""
+    simulation.submit(_FailingAction())
+    with pytest.raises(RuntimeError) as excinfo:
+        wait_for(lambda: simulation.snapshot is None)  # Only returns by raising.
+    assert isinstance(excinfo.value.__cause__, ValueError)
+    with pytest.raises(RuntimeError):
+        simulation.submit(MoveAction(RIGHT))